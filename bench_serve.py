@@ -0,0 +1,65 @@
+import argparse
+import http.client
+import time
+from threading import Thread
+from urllib.parse import urlsplit
+
+# Requests-per-second benchmark. The original nc-loop serve.sh only answers one
+# connection at a time and closes it, so compare it with --no-keepalive, e.g.:
+#   git show f6e29fe:serve.sh > /tmp/serve-nc.sh
+#   bash /tmp/serve-nc.sh md2html.html 1222 &  python bench_serve.py http://127.0.0.1:1222/ --no-keepalive
+#   python serve.py 1223                    &  python bench_serve.py http://127.0.0.1:1223/md2html.html
+
+def worker(url, deadline, keepalive, results):
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    conn = None
+    completed = errors = 0
+    while time.monotonic() < deadline:
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=5)
+            conn.request('GET', path, headers={} if keepalive else {'Connection': 'close'})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+            else:
+                completed += 1
+            if not keepalive or response.will_close:
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            if conn is not None:
+                conn.close()
+                conn = None
+    if conn is not None:
+        conn.close()
+    results.append((completed, errors))
+
+def run(url, concurrency, duration, keepalive):
+    results = []
+    deadline = time.monotonic() + duration
+    threads = [Thread(target=worker, args=(url, deadline, keepalive, results)) for _ in range(concurrency)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+    completed = sum(r[0] for r in results)
+    errors = sum(r[1] for r in results)
+    return completed / elapsed, completed, errors
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure requests per second against a URL.')
+    parser.add_argument('url')
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('-t', '--duration', type=float, default=10.0)
+    parser.add_argument('--no-keepalive', action='store_true')
+    args = parser.parse_args()
+
+    rps, completed, errors = run(args.url, args.concurrency, args.duration, not args.no_keepalive)
+    print(f"{args.url}: {rps:.1f} req/s ({completed} ok, {errors} errors, "
+          f"{args.concurrency} clients, {args.duration:.0f}s)")
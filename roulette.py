@@ -1,24 +1,33 @@
 import eventlet
 eventlet.monkey_patch()
 
-from flask import Flask, render_template_string, session, request
-from flask_socketio import SocketIO, emit, join_room, leave_room
-import random
+from flask import Flask, render_template_string, session, request, jsonify
+from flask_socketio import SocketIO, emit, join_room, leave_room, ConnectionRefusedError
+import hashlib
+import os
+import secrets
+import time
+from collections import deque
 from threading import Lock
 import traceback
 
 # --- Configuration ---
 app = Flask(__name__)
-app.config['SECRET_KEY'] = 'a-truly-secret-key-for-roulette'
+# The session cookie carries player_id and authorizes history reads, so its key must not be public.
+# Without ROULETTE_SECRET_KEY a random key is used and sessions end when the server restarts.
+app.config['SECRET_KEY'] = os.environ.get('ROULETTE_SECRET_KEY') or secrets.token_hex(32)
+# Support staff read any player's history with "Authorization: Bearer <token>". Unset disables staff access.
+app.config['STAFF_API_TOKEN'] = os.environ.get('ROULETTE_STAFF_TOKEN')
 socketio = SocketIO(app, async_mode='eventlet')
 thread = None
 thread_lock = Lock()
-game_state = {'timer': 30, 'spinning': False, 'winning_number': None}
+game_state = {'timer': 30, 'spinning': False, 'winning_number': None, 'round': None, 'result_round': None}
 
 # --- Roulette Game Data & Logic ---
 WHEEL_NUMBERS = [0, 32, 15, 19, 4, 21, 2, 25, 17, 34, 6, 27, 13, 36, 11, 30, 8, 23, 10, 5, 24, 16, 33, 1, 20, 14, 31, 9, 22, 18, 29, 7, 28, 12, 35, 3, 26]
 RED_NUMBERS = {1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36}
 BLACK_NUMBERS = {2, 4, 6, 8, 10, 11, 13, 15, 17, 20, 22, 24, 26, 28, 29, 31, 33, 35}
+WHEEL_POSITIONS = {number: position for position, number in enumerate(WHEEL_NUMBERS)}
 PAYOUTS = {
     'single': 35, 'dozen': 2, 'column': 2, 'red': 1, 'black': 1,
     'even': 1, 'odd': 1, 'low': 1, 'high': 1
@@ -62,11 +71,174 @@ def calculate_winnings(bets, winning_number):
             win_details[bet_key] = winnings + amount
     return total_return, win_details
 
+# --- Provably Fair Outcomes ---
+# Outcomes for the next OUTCOME_BATCH_SIZE rounds are drawn from the OS CSPRNG in one
+# call, and each round's commitment is computed up front. The commitment is published
+# when betting opens and the seed is revealed with the result, so a player can check
+# sha256(seed) == commitment and int(seed) % 37 == winning_number after the spin.
+OUTCOME_BATCH_SIZE = 64
+SEED_BYTES = 32
+upcoming_rounds = deque()
+next_round_id = 1
+
+def outcome_from_seed(seed):
+    # 256 bits reduced mod 37: the bias is far below anything measurable.
+    return int.from_bytes(seed, 'big') % len(WHEEL_NUMBERS)
+
+def generate_outcome_batch(first_round_id, count=OUTCOME_BATCH_SIZE):
+    entropy = os.urandom(SEED_BYTES * count)
+    batch = []
+    for i in range(count):
+        seed = entropy[i * SEED_BYTES:(i + 1) * SEED_BYTES]
+        winning_number = outcome_from_seed(seed)
+        batch.append({
+            'round_id': first_round_id + i,
+            'seed': seed.hex(),
+            'commitment': hashlib.sha256(seed).hexdigest(),
+            'winning_number': winning_number,
+            'wheel_position': WHEEL_POSITIONS[winning_number],
+        })
+    return batch
+
+def open_next_round():
+    global next_round_id
+    if not upcoming_rounds:
+        upcoming_rounds.extend(generate_outcome_batch(next_round_id))
+        next_round_id += OUTCOME_BATCH_SIZE
+    game_state['round'] = upcoming_rounds.popleft()
+    socketio.emit('round_commitment', public_round(game_state['round']))
+
+def public_round(round_info):
+    return {'round_id': round_info['round_id'], 'commitment': round_info['commitment']}
+
+# --- Bet History ---
+# A round is stored in settled_rounds the first time a player settles bets on it, so
+# rounds nobody bet on cost nothing. Only the newest HISTORY_MAX_ROUNDS rounds are
+# kept. Each player has an index mapping positions to the round ids they settled, so
+# a page is O(limit) however long the history is. Cursors are index positions and
+# pages run newest first; positions stay stable as old rounds are pruned. Rolling
+# stats of players idle for longer than the widest window are dropped.
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+HISTORY_MAX_ROUNDS = 5000
+ROLLING_WINDOWS = {'1h': 3600, '24h': 24 * 3600}
+settled_rounds = {}
+player_round_index = {}
+player_rolling_stats = {}
+stats_expiry = deque()
+
+def record_settlement(player_id, round_info, bets, total_return, win_details):
+    round_id = round_info['round_id']
+    now = time.time()
+    settled_round = settled_rounds.get(round_id)
+    if settled_round is None:
+        settled_round = settled_rounds[round_id] = {
+            'round_id': round_id,
+            'winning_number': round_info['winning_number'],
+            'seed': round_info['seed'],
+            'commitment': round_info['commitment'],
+            'settled_at': now,
+            'settlements': {},
+        }
+        if len(settled_rounds) > HISTORY_MAX_ROUNDS:
+            prune_oldest_round()
+    if player_id in settled_round['settlements']: return
+    total_bet = sum(bets.values())
+    settled_round['settlements'][player_id] = {
+        'bets': bets.copy(),
+        'total_bet': total_bet,
+        'total_return': total_return,
+        'net_change': total_return - total_bet,
+        'win_details': win_details,
+    }
+    index = player_round_index.setdefault(player_id, {'oldest': 0, 'next': 0, 'round_ids': {}})
+    index['round_ids'][index['next']] = round_id
+    index['next'] += 1
+    stats = player_rolling_stats.setdefault(player_id, {
+        window: {'events': deque(), 'net_profit': 0, 'total_bet': 0, 'rounds': 0}
+        for window in ROLLING_WINDOWS
+    })
+    for window, agg in stats.items():
+        agg['events'].append((now, total_bet, total_return - total_bet))
+        agg['net_profit'] += total_return - total_bet
+        agg['total_bet'] += total_bet
+        agg['rounds'] += 1
+        expire_rolling_events(agg, now - ROLLING_WINDOWS[window])
+    stats_expiry.append((now, player_id))
+    expire_idle_players(now)
+
+def expire_idle_players(now):
+    cutoff = now - max(ROLLING_WINDOWS.values())
+    while stats_expiry and stats_expiry[0][0] < cutoff:
+        _, player_id = stats_expiry.popleft()
+        stats = player_rolling_stats.get(player_id)
+        if stats and all(agg['events'][-1][0] < cutoff for agg in stats.values() if agg['events']):
+            del player_rolling_stats[player_id]
+
+def prune_oldest_round():
+    # Rounds are stored in increasing id order, so the oldest round is also the
+    # oldest entry in the index of every player who bet on it.
+    oldest_round = settled_rounds.pop(next(iter(settled_rounds)))
+    for player_id in oldest_round['settlements']:
+        index = player_round_index[player_id]
+        del index['round_ids'][index['oldest']]
+        index['oldest'] += 1
+        if not index['round_ids']:
+            del player_round_index[player_id]
+
+def expire_rolling_events(agg, cutoff):
+    events = agg['events']
+    while events and events[0][0] < cutoff:
+        _, total_bet, net_change = events.popleft()
+        agg['net_profit'] -= net_change
+        agg['total_bet'] -= total_bet
+        agg['rounds'] -= 1
+
+def get_bet_history_page(player_id, cursor=None, limit=HISTORY_PAGE_SIZE):
+    index = player_round_index.get(player_id, {'oldest': 0, 'next': 0, 'round_ids': {}})
+    end = index['next'] if cursor is None else cursor
+    if end < 0 or end > index['next'] or not 1 <= limit <= HISTORY_MAX_PAGE_SIZE:
+        raise ValueError('Invalid cursor or limit')
+    end = max(end, index['oldest'])
+    start = max(end - limit, index['oldest'])
+    items = []
+    for position in range(end - 1, start - 1, -1):
+        settled_round = settled_rounds[index['round_ids'][position]]
+        items.append({
+            'round_id': settled_round['round_id'],
+            'winning_number': settled_round['winning_number'],
+            'settled_at': settled_round['settled_at'],
+            'seed': settled_round['seed'],
+            'commitment': settled_round['commitment'],
+            **settled_round['settlements'][player_id],
+        })
+    return {'items': items, 'next_cursor': str(start) if start > index['oldest'] else None}
+
+def get_bet_stats(player_id):
+    now = time.time()
+    result = {}
+    for window, agg in player_rolling_stats.get(player_id, {}).items():
+        expire_rolling_events(agg, now - ROLLING_WINDOWS[window])
+        result[window] = {'net_profit': agg['net_profit'], 'total_bet': agg['total_bet'], 'rounds': agg['rounds']}
+    for window in ROLLING_WINDOWS:
+        result.setdefault(window, {'net_profit': 0, 'total_bet': 0, 'rounds': 0})
+    return result
+
+def parse_history_args(args):
+    if not hasattr(args, 'get'):
+        raise ValueError('Expected an object with cursor and limit')
+    cursor = args.get('cursor')
+    if cursor is not None:
+        cursor = int(cursor)
+    return cursor, int(args.get('limit', HISTORY_PAGE_SIZE))
+
 # --- Background Thread ---
 def game_timer_thread():
     global game_state
     while True:
         try:
+            if game_state['round'] is None:
+                open_next_round()
             socketio.sleep(1)
             if not game_state['spinning']:
                 game_state['timer'] -= 1
@@ -75,16 +247,17 @@ def game_timer_thread():
                     game_state['timer'] = 5
                     socketio.emit('start_spin', {'duration': 4500})
                     
-                    winning_number = random.choice(WHEEL_NUMBERS)
-                    game_state['winning_number'] = winning_number
+                    current_round = game_state['round']
+                    game_state['winning_number'] = current_round['winning_number']
+                    game_state['result_round'] = current_round
                     socketio.sleep(4.5)
                     
-                    socketio.emit('spin_result', {
-                        'winning_number': winning_number,
-                        'wheel_position': WHEEL_NUMBERS.index(winning_number)
-                    })
+                    socketio.emit('spin_result', current_round)
                     game_state['spinning'] = False
                     game_state['timer'] = 30
+                    # Never replay a revealed round, even if opening the next one fails.
+                    game_state['round'] = None
+                    open_next_round()
             socketio.emit('timer_update', {'countdown': game_state['timer'], 'spinning': game_state['spinning']})
         except Exception:
             print("--- FATAL ERROR IN BACKGROUND THREAD ---")
@@ -94,18 +267,48 @@ def game_timer_thread():
 # --- Routes & SocketIO Events ---
 @app.route('/')
 def index():
+    if 'player_id' not in session:
+        session['player_id'] = secrets.token_hex(8)
     return render_template_string(HTML_TEMPLATE)
 
+def can_read_player(player_id):
+    if player_id == session.get('player_id'): return True
+    token = app.config.get('STAFF_API_TOKEN')
+    auth = request.headers.get('Authorization', '')
+    return bool(token) and auth.startswith('Bearer ') and secrets.compare_digest(auth[7:], token)
+
+@app.route('/api/players/<player_id>/bets')
+def player_bet_history(player_id):
+    if not can_read_player(player_id):
+        return jsonify({'error': 'Forbidden'}), 403
+    try:
+        cursor, limit = parse_history_args(request.args)
+        return jsonify(get_bet_history_page(player_id, cursor, limit))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/players/<player_id>/stats')
+def player_bet_stats(player_id):
+    if not can_read_player(player_id):
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify(get_bet_stats(player_id))
+
 @socketio.on('connect')
 def handle_connect():
     global thread
     with thread_lock:
         if thread is None:
             thread = socketio.start_background_task(target=game_timer_thread)
+    # Changes to the session here never reach the cookie, so an id minted here would be
+    # invisible to the HTTP API. Players get their id by loading '/'.
+    if 'player_id' not in session:
+        raise ConnectionRefusedError('No session. Reload the page to join the table.')
     session['balance'] = 1000
     session['bets'] = {}
     session['last_bets'] = {}
-    emit('game_state', {'balance': session['balance'], 'timer': game_state['timer']})
+    emit('game_state', {'balance': session['balance'], 'timer': game_state['timer'], 'player_id': session['player_id']})
+    if game_state['round'] is not None:
+        emit('round_commitment', public_round(game_state['round']))
 
 @socketio.on('place_bet')
 def handle_place_bet(data):
@@ -150,11 +353,25 @@ def handle_payout_complete():
     total_return, win_details = calculate_winnings(bets, winning_number)
     session['balance'] += total_return
     net_change = total_return - total_spent
+    if bets:
+        record_settlement(session['player_id'], game_state['result_round'], bets, total_return, win_details)
     session['last_bets'] = bets.copy()
     session['bets'] = {}
     session.modified = True
     emit('payout_result', {'balance': session['balance'], 'net_change': net_change, 'win_details': win_details})
 
+@socketio.on('get_bet_history')
+def handle_get_bet_history(data=None):
+    try:
+        cursor, limit = parse_history_args(data or {})
+        emit('bet_history', get_bet_history_page(session['player_id'], cursor, limit))
+    except (TypeError, ValueError):
+        emit('error', {'message': 'Invalid bet history request.'})
+
+@socketio.on('get_bet_stats')
+def handle_get_bet_stats():
+    emit('bet_stats', get_bet_stats(session['player_id']))
+
 # --- HTML, CSS, JavaScript Template ---
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -396,6 +613,12 @@ HTML_TEMPLATE = """
             width: 150px;
             text-align: center;
         }
+        .round-commitment {
+            font-family: monospace;
+            font-size: 0.75em;
+            opacity: 0.7;
+            text-align: center;
+        }
         .notification {
             position: fixed;
             top: 20px;
@@ -429,6 +652,7 @@ HTML_TEMPLATE = """
                 <h4>Recent Numbers</h4>
                 <div class="history-bar" id="history-bar"></div>
                  <div class="timer mt-3" id="timer"></div>
+                <div class="round-commitment" id="round-commitment"></div>
             </div>
         </div>
 
@@ -468,6 +692,7 @@ HTML_TEMPLATE = """
             const winNumDisplay = document.getElementById('winning-number-display');
             const timerDisplay = document.getElementById('timer');
             const historyBar = document.getElementById('history-bar');
+            const commitmentDisplay = document.getElementById('round-commitment');
             
             const RED_NUMBERS = [1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36];
             const BLACK_NUMBERS = [2, 4, 6, 8, 10, 11, 13, 15, 17, 20, 22, 24, 26, 28, 29, 31, 33, 35];
@@ -586,6 +811,7 @@ HTML_TEMPLATE = """
 
             // --- SocketIO Handlers ---
             socket.on('connect', () => console.log('Connected to server'));
+            socket.on('connect_error', (err) => showNotification(err.message, 'error'));
             socket.on('game_state', (data) => updateBalance(data.balance));
             socket.on('balance_update', (data) => updateBalance(data.balance));
 
@@ -629,8 +855,19 @@ HTML_TEMPLATE = """
                 flicker();
             });
 
+            socket.on('round_commitment', (data) => {
+                commitmentDisplay.textContent = `Round #${data.round_id} commitment: ${data.commitment.slice(0, 16)}…`;
+                commitmentDisplay.title = data.commitment;
+            });
+
             socket.on('spin_result', (data) => {
                 const { winning_number, wheel_position } = data;
+                verifyRound(data).then(ok => {
+                    commitmentDisplay.textContent = `Round #${data.round_id} ${ok ? 'verified ✓' : 'FAILED verification'}`;
+                }).catch(() => {
+                    // crypto.subtle only exists in secure contexts (HTTPS or localhost).
+                    commitmentDisplay.textContent = `Round #${data.round_id} verification unavailable (seed ${data.seed})`;
+                });
                 const degreesPerSlot = 360 / WHEEL_NUMBERS_ORDER.length;
                 const randomOffset = (Math.random() - 0.5) * degreesPerSlot * 0.8;
                 const targetAngle = 360 - (wheel_position * degreesPerSlot + randomOffset);
@@ -673,6 +910,14 @@ HTML_TEMPLATE = """
 
             socket.on('error', (data) => showNotification(data.message, 'error'));
 
+            // --- Round Verification ---
+            async function verifyRound({ seed, commitment, winning_number }) {
+                const seedBytes = new Uint8Array(seed.match(/../g).map(h => parseInt(h, 16)));
+                const digest = new Uint8Array(await crypto.subtle.digest('SHA-256', seedBytes));
+                const digestHex = Array.from(digest, b => b.toString(16).padStart(2, '0')).join('');
+                return digestHex === commitment && Number(BigInt('0x' + seed) % 37n) === winning_number;
+            }
+
             // --- UI Helper Functions ---
             function updateBalance(newBalance) {
                 balanceDisplay.textContent = `$${newBalance}`;
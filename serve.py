@@ -0,0 +1,278 @@
+import argparse
+import email.utils
+import html
+import io
+import os
+import re
+from collections import OrderedDict
+from functools import partial
+from urllib.parse import quote, unquote
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+
+# --- Configuration ---
+DEFAULT_PORT = 1222
+KEEPALIVE_TIMEOUT = 15
+CACHE_MAX_FILE_SIZE = 256 * 1024
+CACHE_MAX_TOTAL_SIZE = 32 * 1024 * 1024
+# Precompressed siblings (jpegcomp.html.br, jpegcomp.html.gz), in order of preference.
+PRECOMPRESSED_VARIANTS = [('br', '.br'), ('gzip', '.gz')]
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# --- Small File Cache ---
+class FileCache:
+    def __init__(self, max_total_size=CACHE_MAX_TOTAL_SIZE):
+        self.max_total_size = max_total_size
+        self.total_size = 0
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, path, stat):
+        # Returns (data, stat) where stat describes the bytes actually read, so the
+        # caller's headers stay consistent even if the file changed after its os.stat().
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == (stat.st_mtime_ns, stat.st_size):
+                self.entries.move_to_end(path)
+                return entry[1], stat
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+        key = (stat.st_mtime_ns, stat.st_size)
+        if len(data) != stat.st_size:
+            # Rewritten while we were reading it; serve what we got but don't cache it.
+            return data, stat
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.total_size -= len(old[1])
+            self.entries[path] = (key, data)
+            self.total_size += len(data)
+            while self.total_size > self.max_total_size:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.total_size -= len(evicted)
+        return data, stat
+
+file_cache = FileCache()
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        q = params.strip()
+        try:
+            if q.startswith('q=') and float(q[2:] or 0) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+def make_etag(stat, encoding):
+    suffix = '-' + encoding if encoding else ''
+    return '"%x-%x%s"' % (stat.st_mtime_ns, stat.st_size, suffix)
+
+def etag_matches(header, etag):
+    # If-None-Match uses weak comparison (RFC 9110 13.1.2), and '*' matches any representation.
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.removeprefix('W/') == etag:
+            return True
+    return False
+
+def parse_range(header, size):
+    # Only single byte ranges are served; anything else falls back to the full body.
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    if size == 0:
+        return 'unsatisfiable'
+    start, end = match.groups()
+    if start == '':
+        length = int(end)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = size - 1 if end == '' else min(int(end), size - 1)
+    if start >= size or start > end:
+        return 'unsatisfiable'
+    return start, end
+
+# --- Request Handler ---
+class StaticFileHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'trtbStatic/1.0'
+    # Headers and body go out in separate writes; without this, keep-alive stalls on delayed ACKs.
+    disable_nagle_algorithm = True
+    # One thread per connection, so idle keep-alive sockets must not hold theirs forever.
+    timeout = KEEPALIVE_TIMEOUT
+
+    def do_GET(self):
+        self.serve_file(send_body=True)
+
+    def do_HEAD(self):
+        self.serve_file(send_body=False)
+
+    def serve_file(self, send_body):
+        path = self.translate_path(self.path)
+        # Never expose dotfiles or dot-directories such as .git/ under the served root.
+        relative = os.path.relpath(path, self.directory)
+        if any(part.startswith('.') and part != '.' for part in relative.split(os.sep)):
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return
+        if os.path.isdir(path):
+            if not self.path.split('?', 1)[0].split('#', 1)[0].endswith('/'):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header('Location', self.path.split('?', 1)[0] + '/')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            index = os.path.join(path, 'index.html')
+            if not os.path.isfile(index):
+                listing = self.list_directory(path)
+                if listing is not None:
+                    try:
+                        if send_body:
+                            self.copyfile(listing, self.wfile)
+                    finally:
+                        listing.close()
+                return
+            path = index
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return
+
+        encoding, body_path = self.pick_variant(path)
+        try:
+            stat = os.stat(body_path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return
+        data = None
+        if stat.st_size <= CACHE_MAX_FILE_SIZE:
+            try:
+                data, stat = file_cache.get(body_path, stat)
+            except OSError:
+                self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+                return
+        size = stat.st_size if data is None else len(data)
+        etag = make_etag(stat, encoding)
+
+        if etag_matches(self.headers.get('If-None-Match', ''), etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_common_headers(etag, stat, encoding)
+            self.end_headers()
+            return
+
+        start, end = 0, size - 1
+        status = HTTPStatus.OK
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if range_header and (if_range is None or if_range.strip() == etag):
+            byte_range = parse_range(range_header, size)
+            if byte_range == 'unsatisfiable':
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', 'bytes */%d' % size)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if byte_range is not None:
+                start, end = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        length = end - start + 1 if size else 0
+        self.send_response(status)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Length', str(length))
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header('Content-Range', 'bytes %d-%d/%d' % (start, end, size))
+        self.send_common_headers(etag, stat, encoding)
+        self.end_headers()
+        if not send_body or length == 0:
+            return
+
+        if data is not None:
+            self.wfile.write(memoryview(data)[start:end + 1])
+        else:
+            with open(body_path, 'rb') as f:
+                # socket.sendfile() uses os.sendfile() for a zero-copy transfer where available.
+                sent = self.connection.sendfile(f, offset=start, count=length)
+            if sent != length:
+                # The file shrank mid-transfer; closing is the only way to end the short body.
+                self.close_connection = True
+
+    def send_common_headers(self, etag, stat, encoding):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', email.utils.formatdate(stat.st_mtime, usegmt=True))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+
+    def list_directory(self, path):
+        try:
+            names = sorted(name for name in os.listdir(path) if not name.startswith('.'))
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, 'No permission to list directory')
+            return None
+        title = html.escape('Directory listing for ' + unquote(self.path.split('?', 1)[0]))
+        lines = ['<!DOCTYPE html>', '<html><head><meta charset="utf-8">',
+                 f'<title>{title}</title></head><body>', f'<h1>{title}</h1>', '<hr><ul>']
+        for name in names:
+            display = name + '/' if os.path.isdir(os.path.join(path, name)) else name
+            lines.append(f'<li><a href="{quote(display)}">{html.escape(display)}</a></li>')
+        lines.append('</ul><hr></body></html>')
+        body = '\n'.join(lines).encode('utf-8')
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        return io.BytesIO(body)
+
+    def guess_type(self, path):
+        # A direct request for a precompressed sibling gets its raw bytes, not the
+        # original's type without a Content-Encoding (which browsers would render).
+        if path.endswith('.br'):
+            return 'application/octet-stream'
+        if path.endswith('.gz'):
+            return 'application/gzip'
+        return super().guess_type(path)
+
+    def pick_variant(self, path):
+        accepted = accepted_encodings(self.headers.get('Accept-Encoding', ''))
+        for encoding, suffix in PRECOMPRESSED_VARIANTS:
+            if encoding in accepted and os.path.isfile(path + suffix):
+                return encoding, path + suffix
+        return None, path
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class StaticFileServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, handler, verbose=False):
+        self.verbose = verbose
+        super().__init__(address, handler)
+
+# --- Main Execution ---
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve a directory of static files.')
+    parser.add_argument('port', nargs='?', type=int, default=DEFAULT_PORT)
+    parser.add_argument('-d', '--directory', default=os.getcwd())
+    parser.add_argument('-b', '--bind', default='127.0.0.1', help='use 0.0.0.0 to serve other machines')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    handler = partial(StaticFileHandler, directory=args.directory)
+    with StaticFileServer((args.bind, args.port), handler, verbose=args.verbose) as httpd:
+        print(f"Serving {args.directory} on port {args.port}")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -1,4 +1,6 @@
 #!/bin/bash
+# Kept for compatibility: serves the directory containing <file> with serve.py,
+# which replaced the old one-connection-at-a-time nc loop.
 
 if [ $# -lt 1 ] || [ $# -gt 2 ]; then
     echo "Usage: $0 <file> [port]"
@@ -13,31 +15,5 @@ if [ ! -f "$FILE" ]; then
     exit 1
 fi
 
-CONTENT_TYPE="application/octet-stream"
-
-# Set content type based on file extension
-case "${FILE##*.}" in
-    html|htm) CONTENT_TYPE="text/html" ;;
-    txt) CONTENT_TYPE="text/plain" ;;
-    css) CONTENT_TYPE="text/css" ;;
-    js) CONTENT_TYPE="application/javascript" ;;
-    json) CONTENT_TYPE="application/json" ;;
-    png) CONTENT_TYPE="image/png" ;;
-    jpg|jpeg) CONTENT_TYPE="image/jpeg" ;;
-    gif) CONTENT_TYPE="image/gif" ;;
-esac
-
-# Calculate file size
-FILESIZE=$(stat -c%s "$FILE")
-
-echo "Serving $FILE on port $PORT"
-while true; do
-    {
-        echo -ne "HTTP/1.1 200 OK\r\n"
-        echo -ne "Content-Type: $CONTENT_TYPE\r\n"
-        echo -ne "Content-Length: $FILESIZE\r\n"
-        echo -ne "Connection: close\r\n"
-        echo -ne "\r\n"
-        cat "$FILE"
-    } | nc -l -p $PORT
-done
+echo "Open http://127.0.0.1:$PORT/$(basename "$FILE")"
+exec python3 "$(dirname "$0")/serve.py" "$PORT" -d "$(dirname "$FILE")"